@@ -14,7 +14,7 @@ setup(
     keywords=['ftp', 'ssh', 'scp', 'transfer'],
     py_modules=['splitcopy'],
     python_requires='>=3.4',
-    install_requires=['paramiko', 'scp'],
+    install_requires=['paramiko', 'scp>=0.13.0,<0.16'],
     entry_points={
         'console_scripts': [
             'splitcopy=splitcopy.splitcopy:main',
@@ -0,0 +1,106 @@
+# stdlib
+import io
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# most read ahead requested for a chunk, the kernel's sequential readahead
+# covers the remainder as it is read
+_PREFETCH_SIZE = 4194304
+
+
+class Chunk:
+    """ read-only file-like view of a section of a memory mapped file
+        allows a chunk to be transferred without first writing it to disk
+    """
+
+    def __init__(self, mm, name, offset, length, fd=None):
+        """ Initialise the Chunk class
+            :param mm: memory mapped source file
+            :type: mmap object
+            :param name: name of the chunk
+            :type: string
+            :param offset: position of the chunk in the source file
+            :type: int
+            :param length: size of the chunk in bytes
+            :type: int
+            :param fd: file descriptor of the source file, if it can be
+                sent without reading it in userspace (ie via os.sendfile)
+            :type: int
+        """
+        self.mm = mm
+        self.name = name
+        self.offset = offset
+        self.length = length
+        self.fd = fd
+        self.pos = 0
+
+    def read(self, size=-1):
+        """ reads up to size bytes from the current position
+            :param size: number of bytes to read, all remaining if negative
+            :type: int
+            :returns: data
+            :type: bytes
+        """
+        remaining = self.length - self.pos
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        start = self.offset + self.pos
+        self.pos += size
+        return self.mm[start : start + size]
+
+    def seek(self, pos, whence=os.SEEK_SET):
+        """ sets the current position, relative to the start of the chunk
+            :param pos: position
+            :type: int
+            :param whence: os.SEEK_SET, os.SEEK_CUR or os.SEEK_END
+            :type: int
+            :returns: new position
+            :type: int
+        """
+        if whence == os.SEEK_CUR:
+            pos += self.pos
+        elif whence == os.SEEK_END:
+            pos += self.length
+        self.pos = min(max(pos, 0), self.length)
+        return self.pos
+
+    def tell(self):
+        """ :returns: current position, relative to the start of the chunk
+            :type: int
+        """
+        return self.pos
+
+    def fileno(self):
+        """ :returns: file descriptor of the source file
+            :type: int
+            :raises io.UnsupportedOperation: if there isn't one
+        """
+        if self.fd is None:
+            raise io.UnsupportedOperation("fileno")
+        return self.fd
+
+    def prefetch(self):
+        """ asks the kernel to start reading the start of the chunk into the
+            page cache, called just before the chunk is sent so the first
+            reads don't stall on disk. limited to _PREFETCH_SIZE bytes
+            :returns: None
+        """
+        if self.fd is None or not hasattr(os, "posix_fadvise"):
+            return
+        try:
+            os.posix_fadvise(
+                self.fd,
+                self.offset,
+                min(self.length, _PREFETCH_SIZE),
+                os.POSIX_FADV_WILLNEED,
+            )
+        except OSError as err:
+            logger.debug("posix_fadvise failed: {}".format(str(err)))
+
+    def close(self):
+        """ nothing to release, the memory map is owned by the caller
+            :returns: None
+        """
+        pass
@@ -2,10 +2,14 @@
 import ftplib
 import logging
 import os
-import sys
+import select
+import socket
 
 logger = logging.getLogger(__name__)
 
+# ftplib defaults to 8192 bytes, which means a callback per 8KB
+_BLOCK_SIZE = 1048576
+
 
 class FTP(ftplib.FTP):
     """ FTP utility used to transfer files to and from hosts
@@ -21,7 +25,6 @@ class FTP(ftplib.FTP):
         user = kwargs.get("user")
         passwd = kwargs.get("passwd")
         self.callback = kwargs.get("progress")
-        self.header_bytes = 33
         self.sent = 0
         self.file_size = 0
         ftplib.FTP.__init__(self, host=host, user=user, passwd=passwd, timeout=30)
@@ -34,20 +37,73 @@ class FTP(ftplib.FTP):
             :type: string
         """
         with open(local_file, "rb") as open_local_file:
+            self.putfo(open_local_file, remote_file, os.path.basename(local_file))
 
-            def callback(data):
+    def putfo(self, local_fh, remote_file, file_name):
+        """ copies the contents of a file-like object to remote host
+            :param local_fh: object to read data from
+            :type: file-like object
+            :param remote_file: full path on server
+            :type: string
+            :param file_name: name passed to the progress callback
+            :type: string
+        """
+
+        def callback(data):
+            if self.callback:
+                self.sent += len(data)
+                self.callback(
+                    file_name=file_name, file_size=self.file_size, sent=self.sent
+                )
+
+        # the session may be reused for several files
+        self.sent = 0
+        self.storbinary(
+            cmd="STOR " + remote_file,
+            fp=local_fh,
+            blocksize=_BLOCK_SIZE,
+            callback=callback,
+        )
+
+    def sendfile(self, fd, offset, count, remote_file, file_name):
+        """ copies a section of a file to remote host, using os.sendfile
+            so the data is copied from the page cache to the socket
+            by the kernel rather than being read into a buffer first
+            :param fd: file descriptor of the file to read data from
+            :type: int
+            :param offset: position of the data in the file
+            :type: int
+            :param count: number of bytes to copy
+            :type: int
+            :param remote_file: full path on server
+            :type: string
+            :param file_name: name passed to the progress callback
+            :type: string
+        """
+        self.sent = 0
+        self.voidcmd("TYPE I")
+        with self.transfercmd("STOR " + remote_file) as conn:
+            while self.sent < count:
+                try:
+                    sent = os.sendfile(
+                        conn.fileno(),
+                        fd,
+                        offset + self.sent,
+                        min(count - self.sent, _BLOCK_SIZE),
+                    )
+                except BlockingIOError:
+                    # the socket has a timeout, so is non-blocking internally
+                    if not select.select([], [conn], [], self.timeout)[1]:
+                        raise socket.timeout("timed out")
+                    continue
+                if not sent:
+                    raise EOFError("{} is shorter than expected".format(file_name))
+                self.sent += sent
                 if self.callback:
-                    size_data = sys.getsizeof(data) - self.header_bytes
-                    self.sent += size_data
                     self.callback(
-                        file_name=os.path.basename(local_file),
-                        file_size=self.file_size,
-                        sent=self.sent,
+                        file_name=file_name, file_size=self.file_size, sent=self.sent
                     )
-
-            self.storbinary(
-                cmd="STOR " + remote_file, fp=open_local_file, callback=callback
-            )
+        return self.voidresp()
 
     def get(self, remote_file, local_file):
         """ copies file from remote host to local host
@@ -61,12 +117,11 @@ class FTP(ftplib.FTP):
             def callback(data):
                 local_fh.write(data)
                 if self.callback:
-                    size_data = sys.getsizeof(data) - self.header_bytes
-                    self.sent += size_data
+                    self.sent += len(data)
                     self.callback(
                         file_name=os.path.basename(local_file),
                         file_size=self.file_size,
                         sent=self.sent,
                     )
 
-            self.retrbinary("RETR " + remote_file, callback)
+            self.retrbinary("RETR " + remote_file, callback, blocksize=_BLOCK_SIZE)
@@ -1,5 +1,4 @@
 # stdlib
-import datetime
 import os
 import re
 import socket
@@ -8,6 +7,7 @@ import warnings
 import logging
 import traceback
 import sys
+import time
 from select import select
 
 # 3rd Party
@@ -24,6 +24,8 @@ logging.getLogger("paramiko").setLevel(logging.CRITICAL)
 warnings.simplefilter("ignore", utils.CryptographyDeprecationWarning)
 
 _SHELL_PROMPT = re.compile("(% |# |\$ |> |%\t)$")
+_EXIT_SUCCESS = re.compile(r"\r\n0\r\n")
+_PKEY_HEADER = re.compile(r"-{5}BEGIN (RSA|DSA|EC|OPENSSH) PRIVATE KEY-{5}\s*$")
 _SELECT_WAIT = 0.1
 _RECVSZ = 1024
 
@@ -101,9 +103,7 @@ class SSHShell:
         with open(path, "r") as private_key:
             # only read 1st line
             line = private_key.readline()
-            regex = re.match(
-                r"-{5}BEGIN (RSA|DSA|EC|OPENSSH) PRIVATE KEY-{5}\s*$", line
-            )
+            regex = _PKEY_HEADER.match(line)
             result = str(regex.group(1))
         return result
 
@@ -399,15 +399,14 @@ class SSHShell:
             :type: string
         """
         chan = self._chan
-        now = datetime.datetime.now()
-        timeout_time = now + datetime.timedelta(seconds=timeout)
+        timeout_time = time.perf_counter() + timeout
         output = ""
         while not _SHELL_PROMPT.search(output):
             rd, wr, err = select([chan], [], [], _SELECT_WAIT)
             if rd:
                 data = chan.recv(_RECVSZ)
                 output += data.decode()
-            if datetime.datetime.now() > timeout_time:
+            if time.perf_counter() > timeout_time:
                 raise TimeoutError
         return output
 
@@ -457,7 +456,7 @@ class SSHShell:
             if exitcode:
                 self.write("echo $?".format(cmd))
                 rc = self.stdout_read(timeout)
-                if re.search(r"\r\n0\r\n", rc, re.MULTILINE):
+                if _EXIT_SUCCESS.search(rc):
                     result = True
         except TimeoutError:
             logger.warning("timeout running '{}'".format(cmd))
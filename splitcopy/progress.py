@@ -1,5 +1,6 @@
 # stdlib
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +19,24 @@ class Progress:
         """
         self.total_file_size = total_file_size
         self.last_percent = 0
+        self.next_percent_bytes = self.percent_bytes(1)
         self.sent_sum = 0
         self.files_bytes = {}
+        self.lock = threading.Lock()
+
+    def percent_bytes(self, percent):
+        """ number of bytes that must be sent to reach a given percentage
+            :param percent: percentage of the total file size
+            :type: int
+            :returns: bytes
+            :type: int
+        """
+        return -(-self.total_file_size * percent // 100)
 
     def handle(self, file_name, file_size, sent):
         """ For every % of data transferred, notifies the user
+            called back by every worker thread, the hot path is kept to a
+            dict update, an addition and an integer comparison
             :param file_name: name of file
             :type: string
             :param size: file size in bytes
@@ -30,11 +44,12 @@ class Progress:
             :param sent: bytes transferred
             :type: int
         """
-        self.files_bytes[file_name] = sent
-        logger.debug(self.files_bytes)
-        sent_values = list(self.files_bytes.values())
-        self.sent_sum = sum(sent_values)
-        total_percent_done = int((100 / self.total_file_size) * self.sent_sum)
-        if self.last_percent != total_percent_done:
+        with self.lock:
+            self.sent_sum += sent - self.files_bytes.get(file_name, 0)
+            self.files_bytes[file_name] = sent
+            if self.sent_sum < self.next_percent_bytes:
+                return
+            total_percent_done = self.sent_sum * 100 // self.total_file_size
             self.last_percent = total_percent_done
+            self.next_percent_bytes = self.percent_bytes(total_percent_done + 1)
             print("\r{}% done".format(str(total_percent_done)), end="")
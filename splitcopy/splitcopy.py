@@ -8,26 +8,24 @@
 """
 
 # stdlib
-try:
-    import asyncio
-except ImportError:
-    raise RuntimeError("Splitcopy requires Python 3.4+")
 import argparse
 import concurrent.futures
 import datetime
-import fnmatch
-import functools
 import getpass
-import glob
 import hashlib
+import io
+import json
 import logging
+import mmap
 import os
+import queue
 import re
 import signal
 import shutil
 import socket
 import sys
 import tempfile
+import threading
 import time
 import traceback
 from contextlib import contextmanager
@@ -35,15 +33,46 @@ from math import ceil
 
 # 3rd party
 from scp import SCPClient
+from paramiko import SFTPClient
 from paramiko.ssh_exception import SSHException
 
 # local modules
+from splitcopy.chunk import Chunk
 from splitcopy.paramikoshell import SSHShell
 from splitcopy.progress import Progress
 from splitcopy.ftp import FTP
 
 _BUF_SIZE_READ = 131072
 _BUF_SIZE = 1024
+_SSH_POOL_SIZE = 4
+_SFTP_BLOCK_SIZE = 32768
+# sshd limits the channels per connection (OpenSSH MaxSessions and JUNOS
+# max-sessions-per-connection both default to 10), the shell uses one
+_SFTP_MAX_CHANNELS = 8
+_SHA_FILE = re.compile(r"\.sha([0-9]+)$")
+# matches both 'sha1sum' (<hash>  <file>) and 'sha1' (SHA1 (<file>) = <hash>) output
+_SHA_OUTPUT = re.compile(r"^(?:.* = )?([0-9a-f]{40,128})\b", re.MULTILINE)
+_COMMIT_COMPLETE = re.compile(r"commit complete\r\nExiting configuration mode")
+# matches a configured (set) or deactivated ssh/ftp connection-limit/rate-limit
+_LIMIT_CONF = re.compile(
+    r"^(set|deactivate) (.* services (ssh|ftp) (?:connection|rate)-limit)"
+    r"(?: [0-9]+)?\r?$",
+    re.MULTILINE,
+)
+# assumed link speed in bits/s, used with the rtt to size the chunks
+_LINK_BPS = 100000000
+_MIN_CHUNK_SIZE = 1048576
+_MAX_CHUNK_SIZE = 67108864
+_MIN_CHUNKS = 4
+# max number of chunks each worker sends one after the other
+_MAX_BATCH_SIZE = 10
+# max number of chunks passed to a single remote command, bounds its length
+_MAX_CMD_FILES = 20
+_SHA_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "splitcopy",
+    "checksums.json",
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +85,7 @@ def main():
         raise SystemExit
 
     signal.signal(signal.SIGINT, handlesigint)
-    start_time = datetime.datetime.now()
+    start_time = time.perf_counter()
 
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -76,6 +105,11 @@ def main():
     parser.add_argument(
         "--scp", action="store_true", help="use scp to copy files instead of ftp"
     )
+    parser.add_argument(
+        "--sftp",
+        action="store_true",
+        help="use sftp over a single ssh connection to copy files instead of ftp",
+    )
     parser.add_argument(
         "--noverify",
         action="store_true",
@@ -115,8 +149,8 @@ def main():
     source = args.source
     target = args.target
 
-    if re.search(r".*:", source):
-        if re.search(r"@", source):
+    if ":" in source:
+        if "@" in source:
             user = source.split("@")[0]
             user_specified = True
             host = source.split("@")[1]
@@ -154,8 +188,8 @@ def main():
             "or <host>:<path>"
         )
 
-    if re.search(r".*:", target):
-        if re.search(r"@", target):
+    if ":" in target:
+        if "@" in target:
             user = target.split("@")[0]
             user_specified = True
             host = target.split("@")[1]
@@ -193,9 +227,14 @@ def main():
     if args.pwd:
         passwd = args.pwd[0]
 
-    if not args.scp:
+    if args.sftp:
+        copy_proto = "sftp"
+    elif not args.scp:
         try:
-            ftp_port_check(host)
+            ftp_open = port_check(host, "ftp", 21)
+        except (socket.gaierror, socket.herror):
+            raise SystemExit("address or hostname not reachable")
+        if ftp_open:
             copy_proto = "ftp"
             if not user_specified:
                 user_input = input("Username (or hit enter to use '{}'): ".format(user))
@@ -203,9 +242,7 @@ def main():
                     user = user_input
             if passwd is None:
                 passwd = getpass.getpass(prompt="Password: ", stream=None)
-        except (socket.gaierror, socket.herror):
-            raise SystemExit("address or hostname not reachable")
-        except (socket.timeout, ConnectionRefusedError, IOError, OSError):
+        else:
             copy_proto = "scp"
     else:
         copy_proto = "scp"
@@ -242,25 +279,62 @@ def main():
         loop_start, loop_end = splitcopy.put()
 
     # and we are done...
-    end_time = datetime.datetime.now()
-    time_delta = end_time - start_time
-    transfer_delta = loop_end - loop_start
+    end_time = time.perf_counter()
+    time_delta = datetime.timedelta(seconds=end_time - start_time)
+    transfer_delta = datetime.timedelta(seconds=loop_end - loop_start)
     print("data transfer = {}\ntotal runtime = {}".format(transfer_delta, time_delta))
 
 
-def ftp_port_check(host):
-    """ checks if ftp port is open on remote host, emulates 'nc -z <host> <port>'
+def port_check(host, proto, port):
+    """ checks if a port is open on remote host, emulates 'nc -z <host> <port>'
         :param host: host to test
         :type: string
-        :returns: None
-        :raises: any exception
+        :param proto: name of the protocol using the port
+        :type: string
+        :param port: port to test
+        :type: int
+        :returns: True if the port is open
+        :type: bool
+        :raises socket.gaierror: if the host name cannot be resolved
+        :raises socket.herror: if the host address cannot be resolved
     """
-    logger.info("entering ftp_port_check()")
+    logger.info("entering port_check()")
     try:
-        with socket.create_connection((host, 21), 10) as ftp_sock:
-            pass
-    except Exception:
+        with socket.create_connection((host, port), 5):
+            return True
+    except (socket.gaierror, socket.herror):
         raise
+    except OSError as err:
+        logger.info("remote {} port {} isn't open: {}".format(proto, port, err))
+        return False
+
+
+def rtt_check(host, port):
+    """ measures the round trip time to the remote host using the time
+        it takes to establish a tcp connection
+        :param host: host to test
+        :type: string
+        :param port: port to connect to
+        :type: int
+        :returns: round trip time in seconds, None if it couldn't be measured
+        :type: float
+    """
+    logger.info("entering rtt_check()")
+    try:
+        # resolve the address first, so only the tcp handshake is timed
+        family, socktype, proto, _, addr = socket.getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )[0]
+        with socket.socket(family, socktype, proto) as sock:
+            sock.settimeout(5)
+            start = time.perf_counter()
+            sock.connect(addr)
+            rtt = time.perf_counter() - start
+    except OSError as err:
+        logger.info("unable to measure rtt to port {}: {}".format(port, err))
+        return None
+    logger.info("rtt = {}".format(rtt))
+    return rtt
 
 
 class SplitCopy:
@@ -308,7 +382,16 @@ class SplitCopy:
         self.sha_len = None
         self.mute = False
         self.sha_hash = {}
+        self.sha_thread = None
+        self.sha_error = None
+        self.sha_stop = threading.Event()
+        self.chunk_verify = False
+        self.chunk_sha = {}
+        self.chunks_verified = 0
+        self.chunks_resumed = set()
         self.executor = None
+        self.max_workers = None
+        self.ssh_pool = None
         self.ssh_kwargs = {
             "username": self.user,
             "hostname": self.host,
@@ -318,6 +401,9 @@ class SplitCopy:
         }
 
     def handlesigint(self, sigint, stack):
+        if self.hard_close and not self.get_op:
+            # interrupted during the transfer, keep the chunks copied so far
+            self.resume_keep_remote()
         self.close()
 
     def connect(self):
@@ -347,9 +433,9 @@ class SplitCopy:
         """ copies file from local host to remote host
             performs file split/transfer/join/verify functions
             :returns loop_start: time when transfers started
-            :type: datetime object
+            :type: float
             :returns loop_end: time when transfers ended
-            :type: datetime object
+            :type: float
         """
         # handle sigint gracefully on *nix, WIN32 is (of course) a basket case
         signal.signal(signal.SIGINT, self.handlesigint)
@@ -374,83 +460,154 @@ class SplitCopy:
             )
             self.copy_proto = "scp"
 
-        # cleanup previous remote tmp directory if found
-        self.remote_cleanup(True)
+        # chunk files are verified on the remote host as they arrive
+        self.chunk_verify = not self.noverify and self.copy_proto != "sftp"
+
+        # resume from the remote tmp directory of a previous attempt if found,
+        # as its chunks can be verified. otherwise clean it up
+        existing = {}
+        if self.chunk_verify:
+            existing = self.resume_find_remote()
+        if not existing:
+            self.remote_cleanup(True)
 
         # confirm remote storage is sufficient
         self.storage_check_remote()
 
-        # confirm local storage is sufficient
-        self.storage_check_local()
-
         if not self.noverify:
             # get/create sha for local file
             self.local_sha_put()
 
+        # begin connection/rate limit check and transfer process.
+        # done before the rtt is measured, so that doesn't count against a limit
+        if self.junos or self.evo:
+            self.limit_check()
+
         # determine optimal size for chunks
         self.file_split_size()
+        if existing:
+            # the rtt may have changed, split as the previous attempt did.
+            # the largest chunk found is the only one that may be complete,
+            # unless it yields more chunks than file_split_size() could
+            split_size = max(existing.values())
+            max_chunks = max(
+                self.max_workers * _MAX_BATCH_SIZE,
+                ceil(self.file_size / _MAX_CHUNK_SIZE),
+            )
+            if (
+                0 < split_size <= _MAX_CHUNK_SIZE
+                and ceil(self.file_size / split_size) <= max_chunks
+            ):
+                self.split_size = split_size
 
-        with self.tempdir():
-            # split file into chunks
-            self.split_file_local()
-
-            # add chunk names to a list
-            sfiles = []
-            for sfile in os.listdir("."):
-                if fnmatch.fnmatch(sfile, "{}*".format(self.local_file)):
-                    sfiles.append([sfile, os.stat(sfile).st_size])
-            if not len(sfiles):
-                self.close(err_str="file split operation failed")
-            logger.info("# of chunks = {}".format(len(sfiles)))
+        if not self.file_size:
+            self.close(err_str="file split operation failed")
+
+        with open(self.local_path, "rb") as src, mmap.mmap(
+            src.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            # map the chunks onto the source file, nothing is written to disk
+            chunks = self.split_file_local(mm, src.fileno())
+            logger.info("# of chunks = {}".format(len(chunks)))
+            if existing:
+                self.resume_check(chunks, existing)
 
             # end of pre transfer checks, create tmp directory
             self.mkdir_remote()
+            if self.copy_proto == "sftp":
+                # create the file chunks are written to
+                self.sftp_create_remote()
 
-            # begin connection/rate limit check and transfer process
-            if self.junos or self.evo:
-                self.limit_check()
-
+            resumed_bytes = sum(
+                chunk.length for chunk in chunks if chunk.name in self.chunks_resumed
+            )
             if self.copy_proto == "ftp":
                 self.copy_kwargs.update(
                     {
-                        "progress": Progress(self.file_size).handle,
+                        "progress": Progress(self.file_size - resumed_bytes).handle,
                         "host": self.host,
                         "user": self.user,
                         "passwd": self.passwd,
                     }
                 )
             else:
-                self.copy_kwargs.update({"progress": Progress(self.file_size).handle})
+                self.copy_kwargs.update(
+                    {"progress": Progress(self.file_size - resumed_bytes).handle}
+                )
+
+            if self.copy_proto == "scp":
+                self.ssh_pool_open(min(_SSH_POOL_SIZE, len(chunks)))
 
             # copy files to remote host
             self.hard_close = True
-            loop_start = datetime.datetime.now()
+            loop_start = time.perf_counter()
             print("starting transfer...")
-            loop = asyncio.get_event_loop()
-            for sfile in sfiles:
-                task = loop.run_in_executor(
-                    self.executor, functools.partial(self.put_files, sfile)
-                )
+            # group the chunks so there are no more batches than workers,
+            # each batch is sent over a single ftp session or scp/sftp channel
+            batch_size = ceil(len(chunks) / self.max_workers)
+            batches = [
+                chunks[idx : idx + batch_size]
+                for idx in range(0, len(chunks), batch_size)
+            ]
+            for batch in batches:
+                task = self.executor.submit(self.put_files, batch)
                 self.tasks.append(task)
+            # number of batches already appended to the file on the remote host
+            joined = 0
+            # indexes of the batches known to have been transferred
+            collected = set()
             try:
-                loop.run_until_complete(asyncio.gather(*self.tasks))
+                pending = self.tasks
+                while pending:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        # raises TransferError if the batch failed
+                        task.result()
+                        collected.add(self.tasks.index(task))
+                        if self.chunk_verify:
+                            self.remote_chunk_sha(
+                                [
+                                    chunk
+                                    for chunk in batches[self.tasks.index(task)]
+                                    if chunk.name not in self.chunks_resumed
+                                ]
+                            )
+                    ready = joined
+                    while ready in collected:
+                        ready += 1
+                    if pending and ready > joined and self.copy_proto != "sftp":
+                        # append the batches transferred so far while the
+                        # remaining ones are still in flight
+                        self.join_files_remote(batches[joined:ready], joined == 0)
+                        joined = ready
             except KeyboardInterrupt:
                 self.mute = True
                 self.close()
             except TransferError:
+                self.resume_keep_remote()
                 self.close(
                     err_str="an error occurred while copying the files to the "
                     "remote host"
                 )
             finally:
-                loop.close()
                 self.hard_close = False
 
         print("\ntransfer complete")
-        loop_end = datetime.datetime.now()
+        loop_end = time.perf_counter()
+        self.ssh_pool_close()
+
+        if self.copy_proto == "sftp":
+            # confirm every chunk was written
+            self.sftp_size_check()
+        else:
+            # combine remaining chunks
+            print("joining files...")
+            self.join_files_remote(batches[joined:], joined == 0)
 
-        # combine chunks
-        self.join_files_remote()
+        # replace the destination only now the file is complete
+        self.move_remote()
 
         # remove remote tmp dir
         self.remote_cleanup()
@@ -465,6 +622,20 @@ class SplitCopy:
                     self.host, self.remote_dir, self.remote_file
                 )
             )
+        elif (
+            self.chunk_verify
+            and self.chunks_verified == len(chunks)
+            and self.remote_size_check()
+        ):
+            if self.sha_thread is not None:
+                # wait for the local sha1, so it is cached for the next run
+                self.sha_thread.join()
+            print(
+                "local and remote sha hash match for every chunk\nfile has been "
+                "successfully copied to {}:{}/{}".format(
+                    self.host, self.remote_dir, self.remote_file
+                )
+            )
         else:
             # generate a sha hash for the combined file, compare to hash of src
             self.remote_sha_put()
@@ -476,9 +647,9 @@ class SplitCopy:
         """ copies file from remote host to local host
             performs file split/transfer/join/verify functions
             :returns loop_start: time when transfers started
-            :type: datetime object
+            :type: float
             :returns loop_end: time when transfers ended
-            :type: datetime object
+            :type: float
         """
         # handle sigint gracefully on *nix, WIN32 is (of course) a basket case
         signal.signal(signal.SIGINT, self.handlesigint)
@@ -508,6 +679,8 @@ class SplitCopy:
 
         # determine remote file size
         self.remote_filesize()
+        if not self.file_size:
+            self.close(err_str="file split operation failed")
 
         # confirm remote storage is sufficient
         self.storage_check_remote()
@@ -519,6 +692,11 @@ class SplitCopy:
             # get/create sha hash for remote file
             self.remote_sha_get()
 
+        # begin connection/rate limit check and transfer process.
+        # done before the rtt is measured, so that doesn't count against a limit
+        if self.junos or self.evo:
+            self.limit_check()
+
         # determine optimal size for chunks
         self.file_split_size()
 
@@ -526,26 +704,9 @@ class SplitCopy:
         self.mkdir_remote()
 
         # split file into chunks
-        self.split_file_remote()
-
-        # add chunk names to a list
-        result, stdout = self.ss.run("ls -l {}/".format(self.remote_tmpdir))
-        if not result:
-            self.close(err_str="couldn't get list of files from host")
-        remote_files = stdout.split("\r\n")
-        sfiles = []
-        for sfile in remote_files:
-            if fnmatch.fnmatch(sfile, "* {}*".format(self.remote_file)):
-                sfile = sfile.split()
-                sfiles.append([sfile[-1], sfile[-5]])
-        if not len(sfiles):
-            self.close(err_str="file split operation failed")
+        sfiles = self.split_file_remote()
         logger.info("# of chunks = {}".format(len(sfiles)))
 
-        # begin connection/rate limit check and transfer process
-        if self.junos or self.evo:
-            self.limit_check()
-
         if self.copy_proto == "ftp":
             self.copy_kwargs.update(
                 {
@@ -558,20 +719,22 @@ class SplitCopy:
         else:
             self.copy_kwargs.update({"progress": Progress(self.file_size).handle})
 
+        if self.copy_proto == "scp":
+            self.ssh_pool_open(min(_SSH_POOL_SIZE, len(sfiles)))
+
         with self.tempdir():
             # copy files from remote host
             self.hard_close = True
-            loop_start = datetime.datetime.now()
-            loop = asyncio.get_event_loop()
+            loop_start = time.perf_counter()
             self.tasks = []
             for sfile in sfiles:
-                task = loop.run_in_executor(
-                    self.executor, functools.partial(self.get_files, sfile)
-                )
+                task = self.executor.submit(self.get_files, sfile)
                 self.tasks.append(task)
             print("starting transfer...")
             try:
-                loop.run_until_complete(asyncio.gather(*self.tasks))
+                for task in concurrent.futures.as_completed(self.tasks):
+                    # raises TransferError if the file failed
+                    task.result()
             except KeyboardInterrupt:
                 self.mute = True
                 self.close()
@@ -581,14 +744,14 @@ class SplitCopy:
                     "the remote host"
                 )
             finally:
-                loop.close()
                 self.hard_close = False
 
             print("\ntransfer complete")
-            loop_end = datetime.datetime.now()
+            loop_end = time.perf_counter()
+            self.ssh_pool_close()
 
             # combine chunks
-            self.join_files_local()
+            self.join_files_local(sfiles)
 
         # remove remote tmp dir
         self.remote_cleanup()
@@ -621,7 +784,7 @@ class SplitCopy:
         if not result:
             err = "failed to determine remote host os, it must be *nix based"
             self.close(err_str=err)
-        self.host_os = stdout[0].split("\n")[0].rstrip()
+        self.host_os = stdout.splitlines()[1]
         if self.host_os == "Linux" and self.evo_os():
             self.evo = True
         else:
@@ -637,7 +800,7 @@ class SplitCopy:
             :return: None
         """
         logger.info("entering validate_remote_path_get()")
-        if re.match(r"~", self.remote_dir):
+        if self.remote_dir.startswith("~"):
             result, stdout = self.ss.run("ls -d {}".format(self.remote_dir))
             if result:
                 self.remote_dir = stdout.split("\n")[1].rstrip()
@@ -681,6 +844,16 @@ class SplitCopy:
             :return: None
         """
         logger.info("entering validate_remote_path_put()")
+        if self.remote_path.startswith("~"):
+            # sftp doesn't expand ~, expand it so all protocols use the full path
+            home, sep, path = self.remote_path.partition("/")
+            result, stdout = self.ss.run("ls -d {}".format(home))
+            if result:
+                self.remote_path = stdout.splitlines()[1].rstrip() + sep + path
+            else:
+                self.close(
+                    err_str="unable to expand remote path {}".format(self.remote_path)
+                )
         if self.ss.run("test -d {}".format(self.remote_path))[0]:
             # target path provided is a directory
             self.remote_file = self.local_file
@@ -726,12 +899,12 @@ class SplitCopy:
         result, stdout = self.ss.run("uname -i")
         if not result:
             self.close(err_str="failed to determine remote host os")
-        uname = stdout.split("\n")[1]
-        if re.match(r"JUNIPER", uname):
+        uname = stdout.splitlines()[1]
+        if uname.startswith("JUNIPER"):
             self.junos = True
             self.bsd_version = 6.0
             self.which_sshd()
-        elif re.match(r"JNPR", uname):
+        elif uname.startswith("JNPR"):
             self.junos = True
             self.which_bsd()
             self.which_sshd()
@@ -746,7 +919,7 @@ class SplitCopy:
         result, stdout = self.ss.run("uname -r")
         if not result:
             self.close(err_str="failed to determine remote bsd version")
-        uname = stdout.split("\n")[1]
+        uname = stdout.splitlines()[1]
         self.bsd_version = float(uname.split("-")[1])
 
     def which_sshd(self):
@@ -755,10 +928,10 @@ class SplitCopy:
         """
         logger.info("entering which_sshd()")
         result, stdout = self.ss.run("sshd -v", exitcode=False)
-        if not re.search(r"OpenSSH_", stdout):
+        if "OpenSSH_" not in stdout:
             self.close(err_str="failed to determine remote openssh version")
         output = stdout.split("\n")[2]
-        version = re.sub(r"OpenSSH_", "", output)
+        version = output.replace("OpenSSH_", "")
         self.sshd_version = float(version[0:3])
 
     def req_binaries(self):
@@ -834,71 +1007,108 @@ class SplitCopy:
             :param err_str: error description
             :type: string
             :raises SystemExit: terminates the script gracefully
-            :raises os._exit: terminates the script immediately (even asyncio loop)
+            :raises os._exit: terminates the script immediately (even worker threads)
         """
         if err_str:
             print(err_str)
+        # stop the background sha1 generation, it would delay the exit
+        self.sha_stop.set()
         if self.rm_remote_tmp:
             self.remote_cleanup()
         if self.config_rollback and self.command_list:
             self.limits_rollback()
         print("closing device connection")
+        self.ssh_pool_close()
         self.ss.close()
         if self.hard_close:
-            try:
-                shutil.rmtree(self.local_tmpdir)
-            except PermissionError:
-                # windows can throw this error, silence it for now
-                print(
-                    "{} may still exist, please delete manually if so".format(
-                        self.local_tmpdir
+            if self.local_tmpdir:
+                try:
+                    shutil.rmtree(self.local_tmpdir)
+                except PermissionError:
+                    # windows can throw this error, silence it for now
+                    print(
+                        "{} may still exist, please delete manually if so".format(
+                            self.local_tmpdir
+                        )
                     )
-                )
             raise os._exit(1)
         else:
             raise SystemExit(1)
 
-    def join_files_remote(self):
-        """ concatenates the file chunks into one file on remote host
+    def join_files_remote(self, batches, first):
+        """ appends file chunks to the file in the remote tmp directory
+            called for each contiguous run of batches as they finish transferring
+            :param batches: batches of chunks to append, in order
+            :type: list
+            :param first: whether these are the first chunks, if so the
+                file is truncated first
+            :type: bool
             :returns None:
         """
         logger.info("entering join_files_remote()")
-        print("joining files...")
-        result = False
-        try:
-            # >{} because > {} could be matched as _SHELL_PROMPT
-            result, stdout = self.ss.run(
-                "cat {}/* >{}/{}".format(
-                    self.remote_tmpdir, self.remote_dir, self.remote_file
-                ),
-                timeout=600,
+        chunks = [chunk for batch in batches for chunk in batch]
+        for idx in range(0, len(chunks), _MAX_CMD_FILES):
+            src_files = " ".join(
+                "{}/{}".format(self.remote_tmpdir, chunk.name)
+                for chunk in chunks[idx : idx + _MAX_CMD_FILES]
             )
-        except Exception as err:
-            logger.debug("".join(traceback.format_exception(*sys.exc_info())))
-            self.close(
-                err_str="{} while combining file chunks on remote host: {}".format(
-                    err.__class__.__name__, str(err)
+            redirect = ">" if first and not idx else ">>"
+            result = False
+            try:
+                # >{} because > {} could be matched as _SHELL_PROMPT
+                result, stdout = self.ss.run(
+                    "cat {} {}{}/{}".format(
+                        src_files, redirect, self.remote_tmpdir, self.remote_file
+                    ),
+                    timeout=600,
+                )
+            except Exception as err:
+                logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+                self.close(
+                    err_str="{} while combining file chunks on remote host: {}".format(
+                        err.__class__.__name__, str(err)
+                    )
                 )
-            )
 
+            if not result:
+                self.close(
+                    err_str=(
+                        "failed to combine chunks on remote host. "
+                        "error was:\n{}".format(stdout)
+                    )
+                )
+
+    def move_remote(self):
+        """ moves the file from the remote tmp directory into place,
+            replacing any existing file only once it is complete
+            :returns None:
+        """
+        logger.info("entering move_remote()")
+        result, stdout = self.ss.run(
+            "mv -f {}/{} {}/{}".format(
+                self.remote_tmpdir, self.remote_file, self.remote_dir, self.remote_file
+            )
+        )
         if not result:
             self.close(
                 err_str=(
-                    "failed to combine chunks on remote host. "
+                    "failed to move the file into place on remote host. "
                     "error was:\n{}".format(stdout)
                 )
             )
 
-    def join_files_local(self):
+    def join_files_local(self, sfiles):
         """ concatenates the file chunks into one file on local host
+            :param sfiles: name and size of each chunk, in order
+            :type: list
             :returns None:
         """
         logger.info("entering join_files_local()")
         print("joining files...")
-        src_files = glob.glob(self.local_tmpdir + os.path.sep + self.remote_file + "*")
         dst_file = self.local_dir + os.path.sep + self.local_file
         with open(dst_file, "wb") as dst:
-            for src in sorted(src_files):
+            for sfile in sfiles:
+                src = os.path.join(self.local_tmpdir, sfile[0])
                 with open(src, "rb") as chunk:
                     data = chunk.read(_BUF_SIZE_READ)
                     while data:
@@ -925,14 +1135,19 @@ class SplitCopy:
             self.config_rollback = False
             self.close(err_str=err)
 
-        if self.sha_bin == "shasum":
-            cmd = "shasum -a {}".format(self.sha_len)
-        else:
-            cmd = "{}".format(self.sha_bin)
-
+        cmd = self.remote_sha_cmd()
         result, stdout = self.ss.run(
             "{} {}/{}".format(cmd, self.remote_dir, self.remote_file), timeout=300
         )
+        if self.sha_thread is not None:
+            # collect the local sha1 generated in the background
+            self.sha_thread.join()
+            if self.sha_error is not None:
+                self.close(
+                    err_str="{} while generating local sha1: {}".format(
+                        self.sha_error.__class__.__name__, str(self.sha_error)
+                    )
+                )
         if not result:
             print(
                 "remote sha hash generation failed or timed out, "
@@ -942,10 +1157,17 @@ class SplitCopy:
                 )
             )
             return
-        if re.match(r"sha.*sum", self.sha_bin):
-            remote_sha = stdout.split("\n")[1].split()[0].rstrip()
-        else:
-            remote_sha = stdout.split("\n")[1].split()[3].rstrip()
+        match = _SHA_OUTPUT.search(stdout)
+        if not match:
+            print(
+                "unable to parse remote sha hash, "
+                'manually check the output of "{} {}/{}" and '
+                "compare against {}".format(
+                    cmd, self.remote_dir, self.remote_file, self.sha_hash[self.sha_len]
+                )
+            )
+            return
+        remote_sha = match.group(1)
         logger.info("remote sha = {}".format(remote_sha))
         if self.sha_hash[self.sha_len] == remote_sha:
             print(
@@ -963,9 +1185,166 @@ class SplitCopy:
             self.config_rollback = False
             self.close(err_str=err)
 
+    def remote_size_check(self):
+        """ compares the size of the file on remote host with the local file
+            :returns: True if the sizes match
+            :type: bool
+        """
+        logger.info("entering remote_size_check()")
+        result, stdout = self.ss.run(
+            "ls -l {}/{}".format(self.remote_dir, self.remote_file)
+        )
+        if result:
+            remote_size = int(stdout.splitlines()[1].split(None, 5)[4])
+            if remote_size == self.file_size:
+                return True
+            logger.warning(
+                "remote file size {} doesn't match local file size {}".format(
+                    remote_size, self.file_size
+                )
+            )
+        return False
+
+    def remote_sha_cmd(self):
+        """ the command used to generate a sha hash on the remote host
+            :returns cmd: the command
+            :type: string
+        """
+        if self.sha_bin == "shasum":
+            cmd = "shasum -a {}".format(self.sha_len)
+        else:
+            cmd = "{}".format(self.sha_bin)
+        return cmd
+
+    def local_chunk_sha(self, chunk):
+        """ generates a sha hash for a chunk, using the same algorithm as the
+            remote sha binary
+            :param chunk: section of the source file
+            :type: Chunk object
+            :returns: sha hash
+            :type: string
+        """
+        if self.sha_len == 1:
+            sha = hashlib.sha1()
+        else:
+            sha = hashlib.new("sha{}".format(self.sha_len))
+        chunk.seek(0)
+        data = chunk.read(_BUF_SIZE_READ)
+        while data:
+            sha.update(data)
+            data = chunk.read(_BUF_SIZE_READ)
+        return sha.hexdigest()
+
+    def remote_chunk_sha(self, batch):
+        """ generates sha hashes for a batch of chunks on the remote host as soon
+            as it has been transferred, while the chunks are likely still cached,
+            and compares them against the local chunk hashes.
+            if every chunk matches, the combined file doesn't have to be hashed
+            :param batch: chunks that have been transferred
+            :type: list of Chunk objects
+            :returns verified: chunks whose hashes match
+            :type: list of Chunk objects
+        """
+        logger.info("entering remote_chunk_sha()")
+        verified = []
+        for idx in range(0, len(batch), _MAX_CMD_FILES):
+            chunks = batch[idx : idx + _MAX_CMD_FILES]
+            src_files = " ".join(
+                "{}/{}".format(self.remote_tmpdir, chunk.name) for chunk in chunks
+            )
+            result, stdout = self.ss.run(
+                "{} {}".format(self.remote_sha_cmd(), src_files), timeout=300
+            )
+            remote_shas = _SHA_OUTPUT.findall(stdout)
+            if not result or len(remote_shas) != len(chunks):
+                logger.info("unable to generate remote sha hash for chunks")
+                continue
+            for chunk, remote_sha in zip(chunks, remote_shas):
+                if self.chunk_sha.get(chunk.name) == remote_sha:
+                    self.chunks_verified += 1
+                    verified.append(chunk)
+                else:
+                    logger.warning("sha hash mismatch for chunk {}".format(chunk.name))
+        return verified
+
+    def resume_find_remote(self):
+        """ looks for the remote tmp directory of a previous attempt to copy
+            the file, and lists the chunks in it. the most recent one is reused,
+            any others are deleted
+            :returns existing: name and size of each chunk found
+            :type: dict
+        """
+        logger.info("entering resume_find_remote()")
+        existing = {}
+        prefix = "{}/splitcopy_{}.".format(self.remote_dir, self.remote_file)
+        result, stdout = self.ss.run("ls -d {}*".format(prefix))
+        if not result:
+            return existing
+        tmpdirs = sorted(
+            line.strip()
+            for line in stdout.splitlines()
+            if line.strip().startswith(prefix)
+        )
+        if not tmpdirs:
+            return existing
+        if len(tmpdirs) > 1:
+            self.ss.run("rm -rf {}".format(" ".join(tmpdirs[:-1])))
+        result, stdout = self.ss.run("ls -l {}".format(tmpdirs[-1]))
+        if not result:
+            return existing
+        for line in stdout.splitlines():
+            fields = line.split()
+            if (
+                len(fields) >= 9
+                and fields[4].isdigit()
+                and fields[-1].startswith("{}_".format(self.remote_file))
+            ):
+                existing[fields[-1]] = int(fields[4])
+        if existing:
+            self.remote_tmpdir = tmpdirs[-1]
+            logger.info("resuming from {}: {}".format(self.remote_tmpdir, existing))
+        return existing
+
+    def resume_check(self, chunks, existing):
+        """ compares the chunks left by a previous attempt with the local
+            chunks. those with matching size and sha hash aren't transferred again
+            :param chunks: sections of the source file
+            :type: list of Chunk objects
+            :param existing: name and size of each chunk on the remote host
+            :type: dict
+            :returns None:
+        """
+        logger.info("entering resume_check()")
+        candidates = [
+            chunk for chunk in chunks if existing.get(chunk.name) == chunk.length
+        ]
+        for chunk in candidates:
+            self.chunk_sha[chunk.name] = self.local_chunk_sha(chunk)
+        verified = self.remote_chunk_sha(candidates)
+        self.chunks_resumed = {chunk.name for chunk in verified}
+        if verified:
+            print(
+                "resuming previous transfer, {} of {} chunks already copied".format(
+                    len(verified), len(chunks)
+                )
+            )
+
+    def resume_keep_remote(self):
+        """ keeps the remote tmp directory upon a failed transfer, so the chunks
+            already copied can be reused by the next attempt
+            :returns None:
+        """
+        if self.chunk_verify and self.remote_tmpdir is not None:
+            self.rm_remote_tmp = False
+            print(
+                "the chunks copied so far have been kept in {}, run the same "
+                "command again to resume".format(self.remote_tmpdir)
+            )
+
     def file_split_size(self):
         """ The chunk size depends on the python version, cpu count,
             the protocol used to copy, FreeBSD and OpenSSH version
+            and the bandwidth delay product of the link
             :returns None:
         """
         logger.info("entering file_split_size()")
@@ -978,14 +1357,10 @@ class SplitCopy:
 
         # each uid can have max of 64 processes
         # modulate worker count to consume no more than 40 pids
-        if self.copy_proto == "ftp":
-            # ftp creates 1 user process per chunk, no modulation required
-            self.split_size = ceil(self.file_size / max_workers)
-        elif max_workers <= 10:
-            # 1 or 2 cpu cores, 5 or 10 workers will create 20-40 pids
-            # no modulation required
-            self.split_size = ceil(self.file_size / max_workers)
-        else:
+        # ftp creates 1 user process per chunk, no modulation required
+        # 1 or 2 cpu cores, 5 or 10 workers will create 20-40 pids
+        # no modulation required
+        if self.copy_proto != "ftp" and max_workers > 10:
             # scp to FreeBSD 6 based junos creates 3 user processes per chunk
             # scp to FreeBSD 10+ based junos creates 2 user processes per chunk
             # +1 user process if openssh version is >= 7.4
@@ -1003,59 +1378,76 @@ class SplitCopy:
             else:
                 pid_count = 4
             max_workers = round(max_pids / pid_count)
-            self.split_size = ceil(self.file_size / max_workers)
 
-        # concurrent.futures.ThreadPoolExecutor can be a limiting factor
-        # if using python < 3.5.3 the default max_workers is 5.
-        # see https://github.com/python/cpython/blob/v3.5.2/Lib/asyncio/base_events.py
-        # hence defining a custom executor to normalize max_workers across versions
+        if self.copy_proto == "sftp":
+            # each sftp worker opens a channel on the one ssh connection
+            max_workers = min(max_workers, _SFTP_MAX_CHANNELS)
+
+        # chunks should be at least 2x the bandwidth delay product, so the
+        # transfers overlap rather than being dominated by session setup.
+        # the chunks are grouped into batches, one per worker, so there can
+        # be more chunks than workers without creating more pids.
+        # if the rtt can't be measured (ie via a proxy), use max_workers chunks
+        # of up to _MAX_CHUNK_SIZE
+        num_chunks = max_workers
+        if self.copy_proto == "ftp":
+            rtt = rtt_check(self.host, 21)
+        else:
+            rtt = rtt_check(self.host, 22)
+        if rtt is not None:
+            optimal_chunk = int(rtt * _LINK_BPS / 8 * 2)
+            optimal_chunk = min(max(optimal_chunk, _MIN_CHUNK_SIZE), _MAX_CHUNK_SIZE)
+            num_chunks = max(
+                _MIN_CHUNKS,
+                min(
+                    max_workers * _MAX_BATCH_SIZE, ceil(self.file_size / optimal_chunk),
+                ),
+            )
+        # chunks larger than _MAX_CHUNK_SIZE overlap poorly, even if that
+        # means more than _MAX_BATCH_SIZE chunks per worker
+        num_chunks = max(num_chunks, ceil(self.file_size / _MAX_CHUNK_SIZE))
+        if self.get_op:
+            # get_files() copies each chunk over its own ftp session or
+            # scp/sftp channel, only put() batches them
+            num_chunks = min(num_chunks, max_workers)
+        self.split_size = ceil(self.file_size / num_chunks)
+
+        # the default max_workers of concurrent.futures.ThreadPoolExecutor
+        # varies across python versions and is unrelated to the pid limits
+        # above, hence defining the executor's max_workers explicitly
+        self.max_workers = max_workers
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
         logger.info(
-            "max_workers = {}, cpu_count = {}, split_size = {}".format(
-                max_workers, cpu_count, self.split_size
+            "max_workers = {}, cpu_count = {}, num_chunks = {}, split_size = {}".format(
+                max_workers, cpu_count, num_chunks, self.split_size
             )
         )
 
-    def split_file_local(self):
-        """ splits file into chunks of size already determined in file_split_size()
-            This function emulates GNU split.
-            :returns None:
+    def split_file_local(self, mm, fd):
+        """ divides the memory mapped file into chunks of size already determined
+            in file_split_size(). Chunks are named as split_file_remote() does.
+            :param mm: memory mapped source file
+            :type: mmap object
+            :param fd: file descriptor of the source file
+            :type: int
+            :returns chunks: the chunks to transfer
+            :type: list of Chunk objects
         """
         logger.info("entering split_file_local()")
-        print("splitting file...")
-        try:
-            total_bytes = 0
-            with open(self.local_path, "rb") as src:
-                sfx_1 = "a"
-                sfx_2 = "a"
-                while total_bytes < self.file_size:
-                    with open(
-                        "{}{}{}".format(self.local_file, sfx_1, sfx_2), "wb"
-                    ) as chunk:
-                        logger.info(
-                            "writing data to {}{}{}".format(
-                                self.local_file, sfx_1, sfx_2
-                            )
-                        )
-                        src.seek(total_bytes)
-                        data = src.read(self.split_size)
-                        chunk.write(data)
-                        total_bytes += self.split_size
-                    if sfx_2 == "z":
-                        sfx_1 = "b"
-                        sfx_2 = "a"
-                    else:
-                        sfx_2 = chr(ord(sfx_2) + 1)
-        except Exception as err:
-            err_str = (
-                "an error occurred while splitting the file, "
-                "the error was:\n{}".format(err)
-            )
-            self.close(err_str)
+        chunks = []
+        for idx, offset in enumerate(range(0, self.file_size, self.split_size)):
+            name = "{}_{:02d}".format(self.remote_file, idx)
+            length = min(self.split_size, self.file_size - offset)
+            logger.info("{} offset {} length {}".format(name, offset, length))
+            chunks.append(Chunk(mm, name, offset, length, fd))
+        return chunks
 
     def split_file_remote(self):
         """ splits file on remote host
-            :returns None:
+            the chunk names and sizes are known in advance, so there is
+            no need to list the directory afterwards
+            :returns sfiles: name and size of each chunk
+            :type: list
         """
         logger.info("entering split_file_remote()")
         total_blocks = ceil(self.file_size / _BUF_SIZE)
@@ -1080,14 +1472,32 @@ class SplitCopy:
 
         # switched to file copy as the '> ' in 'echo cmd > file'
         # would sometimes be interpreted as shell prompt
-        with self.tempdir():
-            with open("split.sh", "w") as fd:
-                fd.write(cmd)
-            transport = self.ss._transport
-            with SCPClient(transport, **self.copy_kwargs) as scpclient:
-                scpclient.put("split.sh", "{}/split.sh".format(self.remote_tmpdir))
+        transport = self.ss._transport
+        with SCPClient(transport, **self.copy_kwargs) as scpclient:
+            scpclient.putfo(
+                io.BytesIO(cmd.encode()), "{}/split.sh".format(self.remote_tmpdir)
+            )
 
-        self.ss.run("sh {}/split.sh".format(self.remote_tmpdir))
+        self.ss.run("sh {}/split.sh".format(self.remote_tmpdir), timeout=600)
+
+        sfiles = []
+        chunk_bytes = block_size * _BUF_SIZE
+        for idx, offset in enumerate(range(0, self.file_size, chunk_bytes)):
+            sfiles.append(
+                [
+                    "{}_{:02d}".format(self.remote_file, idx),
+                    min(chunk_bytes, self.file_size - offset),
+                ]
+            )
+        if not sfiles:
+            self.close(err_str="file split operation failed")
+        # the last chunk is only created once the others have been written
+        result, stdout = self.ss.run(
+            "test -r {}/{}".format(self.remote_tmpdir, sfiles[-1][0])
+        )
+        if not result:
+            self.close(err_str="file split operation failed")
+        return sfiles
 
     def local_sha_get(self):
         """ generates a sha hash for the combined file on the local host
@@ -1162,30 +1572,126 @@ class SplitCopy:
                 local_sha = shafile.read().split()[0].rstrip()
                 self.sha_hash[1] = local_sha
         if not self.sha_hash:
+            local_sha = self.sha1_cache_read()
+            if local_sha:
+                self.sha_hash[1] = local_sha
+        if not self.sha_hash:
+            # placeholder, the hash is generated in the background while the
+            # transfer proceeds and is collected by remote_sha_put(), or if the
+            # chunks are verified, just to populate the cache
             print("sha1 not found, generating sha1...")
-            sha1 = hashlib.sha1()
-            with open(file_path, "rb") as original_file:
-                data = original_file.read(_BUF_SIZE_READ)
-                while data:
-                    sha1.update(data)
-                    data = original_file.read(_BUF_SIZE_READ)
-            local_sha = sha1.hexdigest()
-            self.sha_hash[1] = local_sha
+            self.sha_hash[1] = True
+            self.sha_thread = threading.Thread(target=self.local_sha1_gen, daemon=True)
+            self.sha_thread.start()
         logger.info("local sha hashes = {}".format(self.sha_hash))
         self.req_sha_binaries()
 
+    def local_sha1_gen(self):
+        """ generates a sha1 hash for the local file using its own memory map
+            hashlib releases the GIL, so this runs in parallel with the transfers
+            runs in a daemon thread, which stops early if close() sets sha_stop
+            any exception is stored in sha_error for remote_sha_put()
+            :returns None:
+        """
+        logger.info("entering local_sha1_gen()")
+        sha1 = hashlib.sha1()
+        try:
+            # taken before hashing, so a file modified meanwhile won't match
+            # the cache entry on the next run
+            stat = os.stat(self.local_path)
+            with open(self.local_path, "rb") as src, mmap.mmap(
+                src.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm, memoryview(mm) as data:
+                for offset in range(0, self.file_size, _BUF_SIZE_READ):
+                    if self.sha_stop.is_set():
+                        logger.info("local sha1 generation cancelled")
+                        return
+                    sha1.update(data[offset : offset + _BUF_SIZE_READ])
+        except Exception as err:
+            logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+            self.sha_error = err
+            return
+        self.sha_hash[1] = sha1.hexdigest()
+        logger.info("local sha1 = {}".format(self.sha_hash[1]))
+        self.sha1_cache_write(self.sha_hash[1], stat)
+
+    def sha1_cache_key(self):
+        """ cache entries are keyed by a hash of the local file path
+            :returns: key
+            :type: string
+        """
+        return hashlib.sha256(self.local_path.encode()).hexdigest()
+
+    def sha1_cache_read(self):
+        """ looks up the sha1 of the local file in the checksum cache
+            the entry is only valid if the file mtime and size are unchanged
+            :returns: sha1 or None if not cached
+            :type: string
+        """
+        logger.info("entering sha1_cache_read()")
+        try:
+            with open(_SHA_CACHE, "r") as cache_file:
+                entry = json.load(cache_file).get(self.sha1_cache_key())
+            stat = os.stat(self.local_path)
+        except (OSError, ValueError, AttributeError):
+            logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+            return None
+        if (
+            isinstance(entry, dict)
+            and entry.get("mtime") == stat.st_mtime_ns
+            and entry.get("size") == stat.st_size
+        ):
+            logger.info("sha1 found in {}".format(_SHA_CACHE))
+            return entry.get("sha1")
+        return None
+
+    def sha1_cache_write(self, sha1, stat):
+        """ stores the sha1 of the local file in the checksum cache
+            failure to update the cache is not fatal
+            :param sha1: sha1 of the local file
+            :type: string
+            :param stat: stat of the local file, taken before it was hashed
+            :type: os.stat_result object
+            :returns None:
+        """
+        logger.info("entering sha1_cache_write()")
+        try:
+            try:
+                with open(_SHA_CACHE, "r") as cache_file:
+                    cache = json.load(cache_file)
+                if not isinstance(cache, dict):
+                    cache = {}
+            except (OSError, ValueError):
+                cache = {}
+            cache[self.sha1_cache_key()] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha1": sha1,
+            }
+            os.makedirs(os.path.dirname(_SHA_CACHE), exist_ok=True)
+            tmp_file = "{}.{}".format(_SHA_CACHE, os.getpid())
+            with open(tmp_file, "w") as cache_file:
+                json.dump(cache, cache_file)
+            os.replace(tmp_file, _SHA_CACHE)
+        except OSError:
+            logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+
     def mkdir_remote(self):
         """ creates a tmp directory on the remote host
             :returns None:
         """
         logger.info("entering mkdir_remote()")
-        ts = datetime.datetime.strftime(datetime.datetime.now(), "%y%m%d%H%M%S")
-        if self.get_op:
-            self.remote_tmpdir = "/var/tmp/splitcopy_{}.{}".format(self.remote_file, ts)
-        else:
-            self.remote_tmpdir = "{}/splitcopy_{}.{}".format(
-                self.remote_dir, self.remote_file, ts
-            )
+        # already set if reusing the tmp directory of a previous attempt
+        if self.remote_tmpdir is None:
+            ts = datetime.datetime.strftime(datetime.datetime.now(), "%y%m%d%H%M%S")
+            if self.get_op:
+                self.remote_tmpdir = "/var/tmp/splitcopy_{}.{}".format(
+                    self.remote_file, ts
+                )
+            else:
+                self.remote_tmpdir = "{}/splitcopy_{}.{}".format(
+                    self.remote_dir, self.remote_file, ts
+                )
         result, stdout = self.ss.run("mkdir -p {}".format(self.remote_tmpdir))
         if not result:
             err = (
@@ -1206,7 +1712,7 @@ class SplitCopy:
             lines = stdout.split("\n")
             for line in lines:
                 line = line.rstrip()
-                match = re.search(r"\.sha([0-9]+)$", line)
+                match = _SHA_FILE.search(line)
                 if match:
                     sha_num = int(match.group(1))
                     logger.info("{} file found".format(line))
@@ -1226,13 +1732,10 @@ class SplitCopy:
             result, stdout = self.ss.run(
                 "{} {}".format(self.sha_bin, self.remote_path), timeout=120
             )
-            if not result:
+            match = _SHA_OUTPUT.search(stdout)
+            if not result or not match:
                 self.close(err_str="failed to generate remote sha1")
-
-            if re.match(r"sha.*sum", self.sha_bin):
-                self.sha_hash[1] = stdout.split("\n")[1].split()[0].rstrip()
-            else:
-                self.sha_hash[1] = stdout.split("\n")[1].split()[3].rstrip()
+            self.sha_hash[1] = match.group(1)
         logger.info("remote sha hashes = {}".format(self.sha_hash))
 
     def remote_filesize(self):
@@ -1242,7 +1745,7 @@ class SplitCopy:
         logger.info("entering remote_filesize()")
         result, stdout = self.ss.run("ls -l {}".format(self.remote_path))
         if result:
-            self.file_size = int(stdout.split("\n")[1].split()[4])
+            self.file_size = int(stdout.splitlines()[1].split(None, 5)[4])
         else:
             self.close(err_str="cannot determine remote file size")
         logger.info("src file size is {}".format(self.file_size))
@@ -1257,18 +1760,23 @@ class SplitCopy:
         if self.get_op:
             multiplier = 1
             result, stdout = self.ss.run("df -k {}".format(self.remote_dir))
+        elif self.copy_proto == "sftp":
+            # chunks are written directly into the file
+            multiplier = 1
+            result, stdout = self.ss.run("df -k {}".format(self.remote_dir))
         else:
             multiplier = 2
             result, stdout = self.ss.run("df -k {}".format(self.remote_dir))
         if not result:
             self.close(err_str="failed to determine remote disk space available")
-        df_num = len(stdout.split("\n")) - 2
-        if re.match(r"^ ", stdout.split("\n")[df_num]):
+        # last line before the prompt
+        df_line = stdout.splitlines()[-2]
+        if df_line.startswith(" "):
             split_num = 2
         else:
             split_num = 3
         try:
-            avail_blocks = stdout.split("\n")[df_num].split()[split_num].rstrip()
+            avail_blocks = df_line.split(None, split_num + 1)[split_num]
         except Exception:
             err_str = "unable to determine available blocks on remote host"
             self.close(err_str)
@@ -1282,6 +1790,13 @@ class SplitCopy:
                     "({}) must be > the original file size ({}) because it has to "
                     "store the file chunks".format(avail_bytes, self.file_size)
                 )
+            elif self.copy_proto == "sftp":
+                err_str = (
+                    "not enough storage on remote host in {}.\nAvailable bytes ({}) "
+                    "must be > the original file size ({})".format(
+                        self.remote_dir, avail_bytes, self.file_size
+                    )
+                )
             else:
                 err_str = (
                     "not enough storage on remote host in {}.\nAvailable bytes ({}) "
@@ -1331,30 +1846,78 @@ class SplitCopy:
                 )
                 self.close(err_str)
 
-    def put_files(self, sfile):
-        """ copies files to remote host via ftp or scp
-            :param sfile: name and size of the file to copy
-            :type: list
+    def put_files(self, batch):
+        """ copies a batch of chunks to remote host via ftp, sftp or scp
+            the chunks in a batch are sent one after the other over a single
+            ftp session, sftp channel or scp channel
+            :param batch: sections of the source file to copy
+            :type: list of Chunk objects
             :raises TransferError: if file transfer fails 3 times
             :returns None:
         """
         err_count = 0
-        file_name = sfile[0]
-        file_size = sfile[1]
-        dstpath = "{}/{}".format(self.remote_tmpdir, file_name)
-        logger.info("{}, size {}".format(file_name, file_size))
+        # chunks already copied by a previous attempt
+        pending = [chunk for chunk in batch if chunk.name not in self.chunks_resumed]
+        if not pending:
+            return
+        logger.info(
+            ", ".join(
+                "{}, size {}".format(chunk.name, chunk.length) for chunk in pending
+            )
+        )
         if self.copy_proto == "ftp":
             while err_count < 3:
                 try:
                     with FTP(**self.copy_kwargs) as ftp:
-                        ftp.put(file_name, dstpath)
+                        while pending:
+                            chunk = pending[0]
+                            dstpath = "{}/{}".format(self.remote_tmpdir, chunk.name)
+                            chunk.prefetch()
+                            if hasattr(os, "sendfile"):
+                                ftp.sendfile(
+                                    chunk.fileno(),
+                                    chunk.offset,
+                                    chunk.length,
+                                    dstpath,
+                                    chunk.name,
+                                )
+                            else:
+                                chunk.seek(0)
+                                ftp.putfo(chunk, dstpath, chunk.name)
+                            pending.pop(0)
                         break
                 except Exception as err:
                     logger.debug("".join(traceback.format_exception(*sys.exc_info())))
                     if not self.mute:
                         logger.warning(
                             "retrying file {} due to {}: {}".format(
-                                file_name, err.__class__.__name__, str(err)
+                                pending[0].name, err.__class__.__name__, str(err)
+                            )
+                        )
+                    err_count += 1
+                    time.sleep(err_count)
+        elif self.copy_proto == "sftp":
+            dstpath = "{}/{}".format(self.remote_tmpdir, self.remote_file)
+            while err_count < 3:
+                try:
+                    # each worker opens a channel on the existing ssh connection
+                    # and writes its chunks directly at their offset in the file
+                    with SFTPClient.from_transport(
+                        self.ss._transport
+                    ) as sftp, sftp.open(dstpath, "r+") as remote_fh:
+                        remote_fh.set_pipelined(True)
+                        for chunk in pending:
+                            self.sftp_write_chunk(remote_fh, chunk)
+                    # the status of pipelined writes isn't checked, so failed
+                    # writes are only detected by sftp_size_check(). a retry
+                    # rewrites the whole batch
+                    break
+                except Exception as err:
+                    logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+                    if not self.mute:
+                        logger.warning(
+                            "retrying file {} due to {}: {}".format(
+                                pending[0].name, err.__class__.__name__, str(err)
                             )
                         )
                     err_count += 1
@@ -1362,21 +1925,16 @@ class SplitCopy:
         else:
             while err_count < 3:
                 try:
-                    with SSHShell(**self.ssh_kwargs) as ssh:
-                        sock = ssh.socket_open()
-                        transport = ssh.transport_open(sock)
-                        if not ssh.worker_thread_auth():
-                            ssh.close()
-                            raise SSHException("authentication failed")
-                        with SCPClient(transport, **self.copy_kwargs) as scpclient:
-                            scpclient.put(file_name, dstpath)
-                            break
+                    transport = self.ssh_pool_transport()
+                    with SCPClient(transport, **self.copy_kwargs) as scpclient:
+                        self.scp_put_batch(scpclient, pending)
+                        break
                 except Exception as err:
                     logger.debug("".join(traceback.format_exception(*sys.exc_info())))
                     if not self.mute:
                         logger.warning(
                             "retrying file {} due to {}: {}".format(
-                                file_name, err.__class__.__name__, str(err)
+                                pending[0].name, err.__class__.__name__, str(err)
                             )
                         )
                     err_count += 1
@@ -1386,8 +1944,116 @@ class SplitCopy:
             self.mute = True
             raise TransferError
 
+        if self.chunk_verify:
+            for chunk in batch:
+                if chunk.name not in self.chunks_resumed:
+                    self.chunk_sha[chunk.name] = self.local_chunk_sha(chunk)
+
+    def scp_put_batch(self, scpclient, pending):
+        """ sends the chunks over a single 'scp -t' channel, the equivalent of
+            SCPClient.put() with multiple sources, but for file-like objects.
+            one remote scp process receives every chunk in the batch.
+            uses SCPClient internals, hence scp is pinned in setup.py
+            :param scpclient: client to send the chunks with
+            :type: SCPClient object
+            :param pending: chunks not yet sent, each is removed once sent
+            :type: list of Chunk objects
+            :returns None:
+        """
+        scpclient.channel = scpclient._open()
+        try:
+            scpclient.channel.settimeout(scpclient.socket_timeout)
+            scpclient.channel.exec_command(
+                b"scp -t " + scpclient.sanitize(self.remote_tmpdir.encode())
+            )
+            scpclient._recv_confirm()
+            while pending:
+                chunk = pending[0]
+                chunk.prefetch()
+                chunk.seek(0)
+                scpclient._send_file(chunk, chunk.name, "0644", chunk.length)
+                pending.pop(0)
+        finally:
+            scpclient.close()
+
+    def sftp_create_remote(self):
+        """ creates the file in the remote tmp directory that the sftp
+            workers write the chunks into, no join is required.
+            it is moved into place once the transfer succeeds
+            :returns None:
+        """
+        logger.info("entering sftp_create_remote()")
+        dstpath = "{}/{}".format(self.remote_tmpdir, self.remote_file)
+        try:
+            with SFTPClient.from_transport(self.ss._transport) as sftp:
+                sftp.open(dstpath, "w").close()
+        except Exception as err:
+            logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+            self.close(
+                err_str="{} while creating {} on remote host: {}".format(
+                    err.__class__.__name__, dstpath, str(err)
+                )
+            )
+
+    def sftp_size_check(self):
+        """ compares the size of the file the sftp workers wrote the chunks
+            into with the local file. pipelined writes don't report errors
+            (ie ENOSPC), so a failed write would otherwise go unnoticed
+            :returns None:
+        """
+        logger.info("entering sftp_size_check()")
+        dstpath = "{}/{}".format(self.remote_tmpdir, self.remote_file)
+        try:
+            with SFTPClient.from_transport(self.ss._transport) as sftp:
+                remote_size = sftp.stat(dstpath).st_size
+        except Exception as err:
+            logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+            self.close(
+                err_str="{} while checking the size of {} on remote host: {}".format(
+                    err.__class__.__name__, dstpath, str(err)
+                )
+            )
+        if remote_size != self.file_size:
+            self.close(
+                err_str="size of {} on remote host ({}) doesn't match the local "
+                "file size ({}), the transfer failed".format(
+                    dstpath, remote_size, self.file_size
+                )
+            )
+
+    def sftp_write_chunk(self, remote_fh, chunk):
+        """ writes a chunk at its offset in the open remote file
+            :param remote_fh: file open for writing on remote host
+            :type: SFTPFile object
+            :param chunk: section of the source file to copy
+            :type: Chunk object
+            :returns None:
+        """
+        callback = self.sftp_progress(chunk.name)
+        chunk.prefetch()
+        chunk.seek(0)
+        remote_fh.seek(chunk.offset)
+        data = chunk.read(_SFTP_BLOCK_SIZE)
+        while data:
+            remote_fh.write(data)
+            callback(chunk.tell(), chunk.length)
+            data = chunk.read(_SFTP_BLOCK_SIZE)
+
+    def sftp_progress(self, file_name):
+        """ adapts the sftp callback to the Progress.handle() signature
+            :param file_name: name of file being transferred
+            :type: string
+            :returns callback: function sftp calls back to
+            :type: function
+        """
+
+        def callback(sent, size):
+            self.copy_kwargs["progress"](file_name=file_name, file_size=size, sent=sent)
+
+        return callback
+
     def get_files(self, sfile):
-        """ copies files from remote host via ftp or scp
+        """ copies files from remote host via ftp, sftp or scp
             :param sfile: name and size of the file to copy
             :type: list
             :raises TransferError: if file transfer fails 3 times
@@ -1397,12 +2063,32 @@ class SplitCopy:
         file_name = sfile[0]
         file_size = sfile[1]
         srcpath = "{}/{}".format(self.remote_tmpdir, file_name)
+        dstpath = os.path.join(self.local_tmpdir, file_name)
         logger.info("{}, size {}".format(file_name, file_size))
         if self.copy_proto == "ftp":
             while err_count < 3:
                 try:
                     with FTP(**self.copy_kwargs) as ftp:
-                        ftp.get(srcpath, file_name)
+                        ftp.get(srcpath, dstpath)
+                        break
+                except Exception as err:
+                    logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+                    if not self.mute:
+                        logger.warning(
+                            "retrying file {} due to {}: {}".format(
+                                file_name, err.__class__.__name__, str(err)
+                            )
+                        )
+                    err_count += 1
+                    time.sleep(err_count)
+        elif self.copy_proto == "sftp":
+            while err_count < 3:
+                try:
+                    # each worker opens a channel on the existing ssh connection
+                    with SFTPClient.from_transport(self.ss._transport) as sftp:
+                        sftp.get(
+                            srcpath, dstpath, callback=self.sftp_progress(file_name)
+                        )
                         break
                 except Exception as err:
                     logger.debug("".join(traceback.format_exception(*sys.exc_info())))
@@ -1417,15 +2103,10 @@ class SplitCopy:
         else:
             while err_count < 3:
                 try:
-                    with SSHShell(**self.ssh_kwargs) as ssh:
-                        sock = ssh.socket_open()
-                        transport = ssh.transport_open(sock)
-                        if not ssh.worker_thread_auth():
-                            ssh.close()
-                            raise SSHException("authentication failed")
-                        with SCPClient(transport, **self.copy_kwargs) as scpclient:
-                            scpclient.get(srcpath, file_name)
-                            break
+                    transport = self.ssh_pool_transport()
+                    with SCPClient(transport, **self.copy_kwargs) as scpclient:
+                        scpclient.get(srcpath, dstpath)
+                        break
                 except Exception as err:
                     logger.debug("".join(traceback.format_exception(*sys.exc_info())))
                     if not self.mute:
@@ -1441,37 +2122,84 @@ class SplitCopy:
             self.mute = True
             raise TransferError
 
-    @contextmanager
-    def change_dir(self, cleanup=lambda: True):
-        """ cds into temp directory.
-            Upon script exit, changes back to original directory
-            and calls cleanup() to delete the temp directory
+    def ssh_open(self):
+        """ opens and authenticates an additional ssh session to the host
+            :returns ssh: the session
+            :type: SSHShell object
+            :raises SSHException: if authentication fails
+        """
+        ssh = SSHShell(**self.ssh_kwargs)
+        sock = ssh.socket_open()
+        ssh.transport_open(sock)
+        if not ssh.worker_thread_auth():
+            ssh.close()
+            raise SSHException("authentication failed")
+        return ssh
+
+    def ssh_pool_open(self, count):
+        """ opens the ssh sessions used by the scp workers
+            the sessions are shared, paramiko multiplexes the scp channels
+            over each transport. encryption is spread across the sessions
+            without paying a key exchange per chunk
+            :param count: number of sessions to open
+            :type: int
             :returns None:
         """
-        prevdir = os.getcwd()
-        os.chdir(os.path.expanduser(self.local_tmpdir))
+        logger.info("entering ssh_pool_open()")
+        self.ssh_pool = queue.Queue()
+        futures = [self.executor.submit(self.ssh_open) for _ in range(count)]
+        for future in futures:
+            try:
+                self.ssh_pool.put(future.result())
+            except Exception as err:
+                logger.debug("".join(traceback.format_exception(*sys.exc_info())))
+                self.close(
+                    err_str="{} returned while opening ssh sessions: {}".format(
+                        err.__class__.__name__, str(err)
+                    )
+                )
+
+    def ssh_pool_transport(self):
+        """ rotates through the shared ssh sessions, replacing any that has dropped
+            :returns: transport of the next session
+            :type: paramiko Transport object
+        """
+        ssh = self.ssh_pool.get()
         try:
-            yield
+            if not ssh._transport.is_active():
+                ssh.close()
+                ssh = self.ssh_open()
         finally:
-            os.chdir(prevdir)
-            cleanup()
+            self.ssh_pool.put(ssh)
+        return ssh._transport
+
+    def ssh_pool_close(self):
+        """ closes the ssh sessions used by the scp workers
+            :returns None:
+        """
+        if self.ssh_pool is None:
+            return
+        while True:
+            try:
+                self.ssh_pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self.ssh_pool = None
 
     @contextmanager
     def tempdir(self):
-        """ creates a temp directory
-            defines how to delete directory upon script exit
-            :returns None:
+        """ creates a temp directory, deleting it upon exit
+            the working directory is left alone, callers use the
+            full path instead
+            :returns: full path of the temp directory
+            :type: string
         """
         self.local_tmpdir = tempfile.mkdtemp()
         logger.info(self.local_tmpdir)
-
-        def cleanup():
-            """ deletes temp dir
-            """
-            shutil.rmtree(self.local_tmpdir)
-
-        with self.change_dir(cleanup):
+        try:
             yield self.local_tmpdir
+        finally:
+            shutil.rmtree(self.local_tmpdir)
 
     def limit_check(self):
         """ Checks the remote hosts /etc/inetd file to determine whether there are any
@@ -1480,50 +2208,44 @@ class SplitCopy:
             :returns None:
         """
         logger.info("entering limit_check()")
-        config_stanzas = ["groups", "system services"]
         if self.copy_proto == "ftp":
-            limits = [
-                "services ssh connection-limit",
-                "services ssh rate-limit",
-                "services ftp connection-limit",
-                "services ftp rate-limit",
-            ]
+            protocols = ("ssh", "ftp")
         else:
-            limits = ["services ssh connection-limit", "services ssh rate-limit"]
+            protocols = ("ssh",)
 
         # check for presence of rate/connection limits
-        cli_config = ""
-        conf_line = ""
-        for stanza in config_stanzas:
-            result, stdout = self.ss.run(
-                'cli -c "show configuration {} | display set | no-more"'.format(stanza)
-            )
-            cli_config += stdout
-        for limit in limits:
-            if (
-                cli_config
-                and re.search(r"{} [0-9]".format(limit), cli_config) is not None
-            ):
-                conf_list = cli_config.split("\r\n")
-                for conf_statement in conf_list:
-                    if re.search(r"set .* {} [0-9]".format(limit), conf_statement):
-                        conf_line = re.sub(" [0-9]+$", "", conf_statement)
-                        conf_line = re.sub("set", "deactivate", conf_line)
-                        self.command_list.append("{};".format(conf_line))
-                    if re.search(r"deactivate .* {}".format(limit), conf_statement):
-                        self.command_list.remove("{};".format(conf_line))
+        result, stdout = self.ss.run(
+            'cli -c "show configuration groups | display set | no-more; '
+            'show configuration system services | display set | no-more"'
+        )
+        # limits that are configured and not already deactivated, in order
+        conf_lines = []
+        for match in _LIMIT_CONF.finditer(stdout):
+            action, conf_line, protocol = match.groups()
+            if protocol not in protocols:
+                continue
+            if action == "set":
+                if conf_line not in conf_lines:
+                    conf_lines.append(conf_line)
+            elif conf_line in conf_lines:
+                conf_lines.remove(conf_line)
+        self.command_list.extend(conf_lines)
 
         # if limits were configured, deactivate them
         if self.command_list:
             print("protocol rate-limit/connection-limit configuration found")
             logger.info(self.command_list)
             result, stdout = self.ss.run(
-                'cli -c "edit;{}commit and-quit"'.format("".join(self.command_list)),
+                'cli -c "edit;{};commit and-quit"'.format(
+                    ";".join(
+                        "deactivate " + conf_line for conf_line in self.command_list
+                    )
+                ),
                 exitcode=False,
                 timeout=60,
             )
             # cli always returns true so can't use exitcode
-            if re.search(r"commit complete\r\nExiting configuration mode", stdout):
+            if _COMMIT_COMPLETE.search(stdout):
                 print(
                     "the configuration has been modified. deactivated the limit(s) found"
                 )
@@ -1547,15 +2269,16 @@ class SplitCopy:
             :returns None:
         """
         logger.info("entering limits_rollback()")
-        rollback_cmds = "".join(self.command_list)
-        rollback_cmds = re.sub("deactivate", "activate", rollback_cmds)
+        rollback_cmds = ";".join(
+            "activate " + conf_line for conf_line in self.command_list
+        )
         result, stdout = self.ss.run(
-            'cli -c "edit;{}commit and-quit"'.format(rollback_cmds),
+            'cli -c "edit;{};commit and-quit"'.format(rollback_cmds),
             exitcode=False,
             timeout=60,
         )
         # cli always returns true so can't use exitcode
-        if re.search(r"commit complete\r\nExiting configuration mode", stdout):
+        if _COMMIT_COMPLETE.search(stdout):
             print("the configuration changes made have been reverted.")
             self.ss.run(
                 "logger 'splitcopy has activated "